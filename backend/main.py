@@ -1,14 +1,17 @@
 import os
 import ast
+import asyncio
+import hashlib
+from cachetools import LRUCache
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from dotenv import load_dotenv
 
 from .src.code_analyzer import CodeAnalyzer
 from .src.llm_integration.llm_client import LLMClient, LLMClientError
-from .src.llm_integration.purpose_analyzer import PurposeAnalyzer
-from .src.llm_integration.semantic_matcher import SemanticMatcher # Ensure this is imported
+from .src.llm_integration.combined_analyzer import CombinedAnalyzer
 from .src.llm_integration.hierarchical_explainer import HierarchicalExplainer
 from .src.token_manager import TokenManager
 
@@ -17,6 +20,39 @@ load_dotenv()
 llm_client = LLMClient()
 token_manager = TokenManager()
 
+# In-process caches for repeated submissions, keyed by content digests.
+# The code analysis depends only on the code, and the purpose match only on the purpose and the code.
+analysis_cache = LRUCache(maxsize=512)
+purpose_match_cache = LRUCache(maxsize=512)
+
+# An analysis takes roughly ten times the memory of its source (the per-line breakdown dominates),
+# so only small inputs are cached: 512 entries of at most 16 KB each stay under about 80 MB.
+MAX_CACHED_CODE_BYTES = 16 * 1024
+
+
+def content_digest(text: str) -> bytes:
+    """Returns a short, stable digest of the text for use as a cache key."""
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).digest()
+
+
+def parse_and_analyze(code: str) -> dict:
+    """Parses the code and runs the static analysis on it. Raises SyntaxError for invalid code."""
+    tree = ast.parse(code)
+    return CodeAnalyzer(code, tree=tree).analyze()
+
+
+async def analyze_code_cached(code: str, code_key: bytes) -> dict:
+    """Runs the static analysis on the code, reusing the cached result for code seen before."""
+    code_analysis = analysis_cache.get(code_key)
+    if code_analysis is None:
+        # Parsing and the AST analysis are CPU-only, so both run in a worker thread to keep the event loop free.
+        # Only code that parsed ever reaches the cache, so a cache hit needs no parse.
+        code_analysis = await asyncio.to_thread(parse_and_analyze, code)
+        if len(code.encode("utf-8")) <= MAX_CACHED_CODE_BYTES:
+            analysis_cache[code_key] = code_analysis
+    return code_analysis
+
+
 # Initializing FastAPI App
 app = FastAPI()
 
@@ -41,63 +77,105 @@ class ExplainRequest(BaseModel):
     code: str
     purpose: str | None = None 
     
-# --- Create the API Endpoint ---
-@app.post("/explain/")
-async def explain_code(request: ExplainRequest):
+async def prepare_explanation(code_to_explain: str, user_purpose: str | None) -> dict:
     """
-    This endpoint receives Python code and an optional purpose,
-    then returns a detailed AI-generated explanation.
+    Runs the validation and analysis steps shared by both explanation endpoints.
+    Returns the keyword arguments for the explainer, or raises an HTTPException.
     """
     
-    code_to_explain = request.code
-    user_purpose = request.purpose
-    
-    
-    # 1. Validate Code Syntax
-    try:
-        ast.parse(code_to_explain)
-    except SyntaxError as e:
-        raise HTTPException(status_code=400, detail=f"Invalid Python Code Syntax: {e}")
-    
-    
-    # 2. Validate API Key is available on the server
+    # 1. Validate API Key is available on the server
     if not os.getenv("GEMINI_API_KEY"):
         raise HTTPException(status_code=500, detail="API key is not configured on the server. Please set GEMINI_API_KEY.")
 
 
-    # 3. Validate Input Size
-    if not token_manager.validate_input_size(code_to_explain):
+    # 2. Validate Input Size before spending any analysis work on it
+    if not await token_manager.validate_input_size(code_to_explain):
         raise HTTPException(status_code=413, detail="Input code exceeds the maximum allowed size.")
 
-    # 4. Execute the full analysis pipeline (your original logic)
+    # 3. Validate Code Syntax and execute the analysis pipeline
     try:
-        
-        
-        code_analyzer = CodeAnalyzer(code_to_explain)
-        code_analysis = code_analyzer.analyze()
+        code_key = content_digest(code_to_explain)
+        code_analysis = await analyze_code_cached(code_to_explain, code_key)
         
         structured_purpose = None
         match_report = None # Initialize match_report
 
         if user_purpose:
-            purpose_analyzer = PurposeAnalyzer(llm_client)
-            structured_purpose = purpose_analyzer.analyze_purpose(user_purpose)
-            
-            matcher = SemanticMatcher(llm_client)
-            match_report = matcher.generate_match_report(structured_purpose, code_analysis) # Call the matcher
+            purpose_key = (content_digest(user_purpose), code_key)
+            combined_report = purpose_match_cache.get(purpose_key)
+            if combined_report is None:
+                # One request both structures the purpose and matches it against the code.
+                # analyze() rejects malformed replies, so only well-formed reports reach the cache.
+                combined_analyzer = CombinedAnalyzer(llm_client)
+                combined_report = await combined_analyzer.analyze(user_purpose, code_analysis)
+                purpose_match_cache[purpose_key] = combined_report
+            structured_purpose = combined_report["structured_purpose"]
+            match_report = combined_report["match_report"]
+
+        return {
+            "code_string": code_to_explain,
+            "code_analysis": code_analysis,
+            "validated_purpose": structured_purpose,
+            "match_report": match_report # Pass the match report to the explainer
+        }
 
+    except SyntaxError as e:
+        raise HTTPException(status_code=400, detail=f"Invalid Python Code Syntax: {e}")
+    except LLMClientError as e:
+        raise HTTPException(status_code=503, detail=f"An error occurred with the AI model: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An unexpected server error occurred: {e}")
+
+# --- Create the API Endpoints ---
+@app.post("/explain/")
+async def explain_code(request: ExplainRequest):
+    """
+    This endpoint receives Python code and an optional purpose,
+    then returns a detailed AI-generated explanation.
+    """
+    explanation_context = await prepare_explanation(request.code, request.purpose)
+
+    # 5. Generate and return the final result
+    try:
         explainer = HierarchicalExplainer(llm_client)
-        explanation = explainer.generate_explanation(
-            code_string=code_to_explain,
-            code_analysis=code_analysis,
-            validated_purpose=structured_purpose,
-            match_report=match_report # Pass the match report to the explainer
-        )
-
-        # 5. Return the final result
+        explanation = await explainer.generate_explanation(**explanation_context)
         return {"explanation": explanation}
 
     except LLMClientError as e:
         raise HTTPException(status_code=503, detail=f"An error occurred with the AI model: {e}")
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"An unexpected server error occurred: {e}")
+
+
+@app.post("/explain/stream/")
+async def explain_code_stream(request: ExplainRequest):
+    """
+    Same as /explain/, but streams the Markdown explanation back as plain text
+    while the model generates it, instead of returning it all at once.
+    """
+    explanation_context = await prepare_explanation(request.code, request.purpose)
+
+    explainer = HierarchicalExplainer(llm_client)
+    chunks = explainer.stream_explanation(**explanation_context)
+
+    # 5. Wait for the first chunk before responding, so a failure to start still gets a proper status code
+    try:
+        first_chunk = await anext(chunks, "")
+    except LLMClientError as e:
+        raise HTTPException(status_code=503, detail=f"An error occurred with the AI model: {e}")
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"An unexpected server error occurred: {e}")
+
+    async def stream_body():
+        try:
+            yield first_chunk
+            async for chunk in chunks:
+                yield chunk
+        except LLMClientError as e:
+            # The status code has already been sent, so the error can only be reported in the body
+            yield f"\n\n**Error:** The explanation was interrupted: {e}"
+        finally:
+            # Release the upstream stream right away, even if the client disconnected mid-way
+            await chunks.aclose()
+
+    return StreamingResponse(stream_body(), media_type="text/markdown; charset=utf-8")
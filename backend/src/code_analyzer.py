@@ -1,5 +1,5 @@
 import ast
-from.utils.ast_utils import parse_with_parents
+from.utils.ast_utils import parse_code
 
 # Defining a more comprehensive mapping for statement types
 # These are the AST nodes that represent distinct operations or structures on a line
@@ -30,73 +30,117 @@ STATEMENT_NODE_TYPE_MAP = {
     
 }
 
+# Node kinds that can contain statements. Except handlers and match cases are not statements
+# themselves but hold statement bodies; expression subtrees never contain statements.
+STATEMENT_CONTAINER_TYPES = (ast.stmt, ast.excepthandler, ast.match_case)
+
 
 class CodeAnalyzer(ast.NodeVisitor):
     """
     Analyzes a Python code string to extract its structure at multiple levels.
     """
-    def __init__(self, code_string: str):
+    def __init__(self, code_string: str, tree: ast.Module | None = None):
         self.code_string = code_string
-        self.tree = parse_with_parents(code_string)
+        # Callers that already parsed the code can pass the tree in to avoid a second parse
+        self.tree = tree if tree is not None else parse_code(code_string)
         self.lines = code_string.splitlines() # Store lines once for efficiency
         self.analysis = {
             "high_level_summary": {},
             "functions": {},
             "line_by_line": [] # This will be a list of dicts for each significant line
         }
+        # High-level accumulators, filled in during the single traversal in analyze()
+        self._imports = []
+        self._from_imports = []
+        self._classes = []
+        self._function_count = 0
+        # Node types with a dedicated handler; everything else goes to generic_visit
+        self._visitors = {
+            ast.FunctionDef: self.visit_FunctionDef,
+            ast.ClassDef: self.visit_ClassDef,
+            ast.Import: self.visit_Import,
+            ast.ImportFrom: self.visit_ImportFrom,
+        }
         
         
-        self._temp_line_data = {} 
+        # Per-line data indexed by 1-based line number; None marks blank and comment lines
+        self._line_types = [None] * (len(self.lines) + 1)
+        self._line_content = [None] * (len(self.lines) + 1)
         for i, line_content in enumerate(self.lines, 1):
             stripped_line = line_content.strip()
             # Only consider non-empty, non-comment lines for detailed analysis
             if stripped_line and not stripped_line.startswith('#'):
-                self._temp_line_data[i] = {
-                    "line_number": i,
-                    "content": stripped_line,
-                    "types": []
-                }
+                self._line_types[i] = {} # Used as an insertion-ordered set of type names
+                self._line_content[i] = stripped_line
 
     def analyze(self):
         """Runs the complete multi-level analysis."""
-        self._analyze_high_level()
-        self.visit(self.tree) # This will trigger visit_FunctionDef and generic_visit
+        self.visit(self.tree) # A single traversal collects the high-level summary, functions and line types
+        self._finalize_high_level()
         self._finalize_line_by_line() # Process the collected line data
         return self.analysis
 
-    def _analyze_high_level(self):
-        """Analyzes the overall structure, imports, and classes."""
-        imports = [node.names[0].name for node in ast.walk(self.tree) if isinstance(node, ast.Import)]
-        from_imports = [f"{node.module}.{node.names[0].name}" for node in ast.walk(self.tree) if isinstance(node, ast.ImportFrom)]
-        classes = [node.name for node in ast.walk(self.tree) if isinstance(node, ast.ClassDef)]
-        
+    def _finalize_high_level(self):
+        """Assembles the overall structure, imports, and classes collected during the traversal."""
         self.analysis["high_level_summary"] = {
-            "imports": imports + from_imports,
-            "class_definitions": classes,
-            "total_functions": len([n for n in ast.walk(self.tree) if isinstance(n, ast.FunctionDef)]),
-            "total_lines": len(self.code_string.splitlines())
+            "imports": self._imports + self._from_imports,
+            "class_definitions": self._classes,
+            "total_functions": self._function_count,
+            "total_lines": len(self.lines)
         }
 
+    def visit(self, node: ast.AST):
+        """Dispatches through the precomputed type table instead of NodeVisitor's per-node getattr."""
+        visitor = self._visitors.get(type(node))
+        if visitor:
+            return visitor(node)
+        return self.generic_visit(node)
+
+    def visit_Import(self, node: ast.Import):
+        """Records a plain import statement."""
+        self._imports.append(node.names[0].name)
+        self.generic_visit(node)
+
+    def visit_ImportFrom(self, node: ast.ImportFrom):
+        """Records a 'from ... import ...' statement."""
+        self._from_imports.append(f"{node.module}.{node.names[0].name}")
+        self.generic_visit(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef):
+        """Records a class definition."""
+        self._classes.append(node.name)
+        self.generic_visit(node)
+
     def visit_FunctionDef(self, node: ast.FunctionDef):
         """Analyzes a single function's properties."""
+        self._function_count += 1
         function_name = node.name
-        dependencies = {
-            "calls": [],
-            "uses_variables": set()
-        }
+        calls = set()
+        uses_variables = set()
+        return_statements = 0
+        # Bind the hot methods and node classes locally; calls, variables and returns are collected in one walk.
+        # AST node classes aren't subclassed, so exact type checks can stand in for isinstance.
+        add_call = calls.add
+        add_variable = uses_variables.add
+        Call, Name, Load, Return = ast.Call, ast.Name, ast.Load, ast.Return
         for sub_node in ast.walk(node):
-            if isinstance(sub_node, ast.Call) and isinstance(sub_node.func, ast.Name):
-                dependencies["calls"].append(sub_node.func.id)
-            if isinstance(sub_node, ast.Name) and isinstance(sub_node.ctx, ast.Load):
-                dependencies["uses_variables"].add(sub_node.id)
+            node_type = type(sub_node)
+            if node_type is Call:
+                if type(sub_node.func) is Name:
+                    add_call(sub_node.func.id)
+            elif node_type is Name:
+                if type(sub_node.ctx) is Load:
+                    add_variable(sub_node.id)
+            elif node_type is Return:
+                return_statements += 1
 
         self.analysis["functions"][function_name] = {
             "parameters": [arg.arg for arg in node.args.args],
-            "return_statements": len([n for n in ast.walk(node) if isinstance(n, ast.Return)]),
+            "return_statements": return_statements,
             "start_line": node.lineno,
             "dependencies": {
-                "calls": list(set(dependencies["calls"])),
-                "uses_variables": list(dependencies["uses_variables"])
+                "calls": list(calls),
+                "uses_variables": list(uses_variables)
             }
         }
         # Continue visiting children for line-by-line analysis
@@ -114,28 +158,40 @@ class CodeAnalyzer(ast.NodeVisitor):
             end_line = getattr(node, 'end_lineno', start_line) 
 
             # Associate this node's type with all lines it spans
+            line_types = self._line_types
             for i in range(start_line, end_line + 1):
-                if i in self._temp_line_data and node_type_name not in self._temp_line_data[i]["types"]:
-                    self._temp_line_data[i]["types"].append(node_type_name)
+                types = line_types[i]
+                if types is not None:
+                    types[node_type_name] = None
         
         # Ensure that children of the current node are also visited
-        super().generic_visit(node)
+        # Only statement-bearing children are visited; expressions carry no line labels
+        visitors = self._visitors
+        for child in ast.iter_child_nodes(node):
+            if not isinstance(child, STATEMENT_CONTAINER_TYPES):
+                continue
+            visitor = visitors.get(type(child))
+            if visitor:
+                visitor(child)
+            else:
+                self.generic_visit(child)
 
     def _finalize_line_by_line(self):
         """
-        Sorts the collected line data and defaults types for any lines
-        that didn't get a specific AST node type.
+        Builds the line-by-line list from the collected line data and defaults types
+        for any lines that didn't get a specific AST node type.
         """
-        # Convert dictionary to a sorted list
-        sorted_line_data = sorted(self._temp_line_data.values(), key=lambda x: x["line_number"])
-        
-        
-        for detail in sorted_line_data:
-            if not detail["types"]:
-                detail["types"].append("Code") 
-        
-        self.analysis["line_by_line"] = sorted_line_data
-
+        # Both lists are indexed by line number (slot 0 is always None), so pairing them
+        # up yields the lines already in order with no sorting or index lookups
+        self.analysis["line_by_line"] = [
+            {
+                "line_number": i,
+                "content": content,
+                "types": list(types) or ["Code"]
+            }
+            for i, (content, types) in enumerate(zip(self._line_content, self._line_types))
+            if types is not None
+        ]
 
 if __name__ == '__main__':
     sample_code = """
@@ -0,0 +1,104 @@
+# src/llm_integration/combined_analyzer.py
+
+import asyncio
+import json
+import logging
+from .llm_client import LLMClient, LLMClientError
+
+COMBINED_PROMPT = """
+You are a requirements analyst and code validation expert. Your task is to extract structured information from a user's description of a Python script's purpose, then determine if the script's implementation matches that purpose.
+
+**User's Description:** "{purpose_text}"
+
+**Actual Code Structure Analysis (from AST):**
+```json
+{code_analysis}
+```
+
+First, analyze the description and extract:
+- "main_functionality": A concise, one-sentence summary of what the code is supposed to do.
+- "key_algorithms": A list of any specific algorithms or techniques mentioned (e.g., "sorting", "recursion", "API call").
+- "inputs": A description of the expected inputs.
+- "outputs": A description of the expected outputs.
+
+If any information is not present, use "Not specified."
+
+Then compare the extracted purpose with the code analysis. Does the code's structure (e.g., function names, dependencies, recursion) plausibly implement the user's purpose?
+
+Respond with ONLY a JSON object in the following format:
+{{
+    "structured_purpose": {{
+        "main_functionality": "...",
+        "key_algorithms": ["..."],
+        "inputs": "...",
+        "outputs": "..."
+    }},
+    "match_report": {{
+        "match_confidence": A float between 0.0 (no match) and 1.0 (perfect match).
+        "reason": "A brief, one-sentence explanation for your confidence score, highlighting the key reason for the match or mismatch."
+    }}
+}}
+"""
+
+def compact_code_analysis(code_analysis: dict) -> dict:
+    """
+    Projects a code analysis down to the parts relevant for purpose matching.
+    The per-line breakdown grows with the size of the code and is left out.
+    """
+    return {
+        "high_level_summary": code_analysis.get("high_level_summary", {}),
+        "functions": {
+            name: {
+                "parameters": function.get("parameters", []),
+                "dependencies": function.get("dependencies", {}),
+                "return_statements": function.get("return_statements", 0)
+            }
+            for name, function in code_analysis.get("functions", {}).items()
+        }
+    }
+
+class CombinedAnalyzer:
+    """
+    Uses a single LLM request to both structure the user's purpose description
+    and compare it with the actual code structure.
+    """
+    def __init__(self, llm_client: LLMClient):
+        self.llm_client = llm_client
+
+    async def analyze(self, purpose_text: str, code_analysis: dict) -> dict:
+        """
+        Returns a dict with a "structured_purpose" dict describing the user's goal
+        and a "match_report" dict comparing that goal with the code.
+        Raises LLMClientError if the model's reply doesn't have that shape.
+        """
+        prompt = COMBINED_PROMPT.format(
+            purpose_text=purpose_text,
+            code_analysis=json.dumps(compact_code_analysis(code_analysis), separators=(",", ":"))
+        )
+
+        report = await self.llm_client.make_request(prompt, is_json_output=True)
+
+        if not (
+            isinstance(report, dict)
+            and isinstance(report.get("structured_purpose"), dict)
+            and isinstance(report.get("match_report"), dict)
+        ):
+            logging.error(f"Combined analysis reply has an unexpected shape: {report}")
+            raise LLMClientError("The model returned a purpose analysis in an unexpected format.")
+        return report
+
+if __name__ == '__main__':
+    sample_analysis = {
+        "functions": {
+            "rec": {
+                "parameters": ["a", "b"],
+                "dependencies": {"calls": ["rec"]} # Indicates recursion
+            }
+        }
+    }
+
+    client = LLMClient()
+    analyzer = CombinedAnalyzer(llm_client=client)
+    report = asyncio.run(analyzer.analyze("A recursive function that finds the GCD of two integers.", sample_analysis))
+
+    print(json.dumps(report, indent=2))
@@ -2,13 +2,34 @@
 
 import os
 import json
+import asyncio
 import google.generativeai as genai
 from google.api_core.exceptions import GoogleAPIError
 import logging
+from typing import AsyncIterator
 from backend.src.utils.loggin_config import setup_logging
 
 setup_logging()
 
+# Safety settings for Gemini (optional but recommended)
+# Adjust as needed for your application's tolerance
+SAFETY_SETTINGS = [
+    {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
+    {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
+]
+
+# Generation settings for plain-text and JSON responses, built once and shared by every request
+TEXT_GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "response_mime_type": "text/plain",
+}
+JSON_GENERATION_CONFIG = {
+    "temperature": 0.2,
+    "response_mime_type": "application/json",
+}
+
 # Define a custom exception for cleaner error handling
 class LLMClientError(Exception):
     """Custom exception for LLM client errors."""
@@ -16,7 +37,7 @@ class LLMClientError(Exception):
 
 class LLMClient:
     """A centralized client for interacting with the LLM API."""
-    def __init__(self, model_name: str = "gemini-2.5-flash"): 
+    def __init__(self, model_name: str = "gemini-2.5-flash", max_concurrent_requests: int = 10): 
         api_key = os.environ.get("GEMINI_API_KEY") 
         if not api_key:
             logging.error("GEMINI_API_KEY environment variable not set.")
@@ -25,36 +46,26 @@ class LLMClient:
         genai.configure(api_key=api_key)
         self.client = genai
         self.model = model_name
-        logging.info(f"LLMClient initialized with model: {self.model}")
+        self._model = genai.GenerativeModel(model_name) # Built once and reused for every request
+        # Caps in-flight API calls so bursts of concurrent requests stay within the API quota
+        self._semaphore = asyncio.Semaphore(max_concurrent_requests)
+        logging.info(f"LLMClient initialized with model: {self.model} (max {max_concurrent_requests} concurrent requests)")
 
-    def make_request(self, prompt: str, is_json_output: bool = False) -> dict | str:
+    async def make_request(self, prompt: str, is_json_output: bool = False) -> dict | str:
         """
         Makes a request to the LLM. Returns the response on success,
         and raises LLMClientError on failure.
         """
         logging.info("Making request to LLM...")
         try:
-            model = self.client.GenerativeModel(self.model)
-            
-            generation_config = {
-                "temperature": 0.2,
-                "response_mime_type": "application/json" if is_json_output else "text/plain",
-            }
+            generation_config = JSON_GENERATION_CONFIG if is_json_output else TEXT_GENERATION_CONFIG
 
-            # Safety settings for Gemini (optional but recommended)
-            # Adjust as needed for your application's tolerance
-            safety_settings = [
-                {"category": "HARM_CATEGORY_HARASSMENT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_HATE_SPEECH", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_SEXUALLY_EXPLICIT", "threshold": "BLOCK_NONE"},
-                {"category": "HARM_CATEGORY_DANGEROUS_CONTENT", "threshold": "BLOCK_NONE"},
-            ]
-
-            response = model.generate_content(
-                prompt,
-                generation_config=generation_config,
-                safety_settings=safety_settings
-            )
+            async with self._semaphore:
+                response = await self._model.generate_content_async(
+                    prompt,
+                    generation_config=generation_config,
+                    safety_settings=SAFETY_SETTINGS
+                )
             
             content = response.text
             
@@ -72,3 +83,29 @@ class LLMClient:
         except Exception as e:
             logging.error(f"An unexpected error occurred: {e}")
             raise LLMClientError(f"An unexpected error occurred: {e}") from e
+
+    async def stream_request(self, prompt: str) -> AsyncIterator[str]:
+        """
+        Makes a streaming text request to the LLM, yielding the response text
+        chunk by chunk as it is generated. Raises LLMClientError on failure.
+        """
+        logging.info("Making streaming request to LLM...")
+        try:
+            # The permit only covers starting the request; reading the stream is paced by the
+            # HTTP client, and a slow or vanished reader must not hold up other API calls
+            async with self._semaphore:
+                response = await self._model.generate_content_async(
+                    prompt,
+                    generation_config=TEXT_GENERATION_CONFIG,
+                    safety_settings=SAFETY_SETTINGS,
+                    stream=True
+                )
+            async for chunk in response:
+                yield chunk.text
+
+        except GoogleAPIError as e:
+            logging.error(f"LLM API Error while streaming: {e}")
+            raise LLMClientError(f"The LLM API returned an error: {e}") from e
+        except Exception as e:
+            logging.error(f"An unexpected error occurred while streaming: {e}")
+            raise LLMClientError(f"An unexpected error occurred: {e}") from e
@@ -1,4 +1,5 @@
 import ast
+import math
 import os
 import logging
 import google.generativeai as genai
@@ -8,6 +9,9 @@ from backend.src.utils.loggin_config import setup_logging
 
 setup_logging()
 
+# Google's Gemini docs put a token at about four characters
+CHARS_PER_TOKEN = 4
+
 # Custom exception for token manager errors
 class TokenManagerError(Exception):
     """Custom exception for TokenManager errors."""
@@ -31,9 +35,16 @@ class TokenManager:
         logging.info(f"TokenManager initialized with Gemini model '{self.model_name}' and max_tokens={self.max_tokens}")
 
     def estimate_tokens(self, text: str) -> int:
-        """Estimates the number of tokens in a given text using the Gemini API."""
+        """
+        Estimates the number of tokens in a given text locally, without a network call.
+        This is a heuristic; use count_tokens when an exact figure is needed.
+        """
+        return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+    async def count_tokens(self, text: str) -> int:
+        """Counts the exact number of tokens in a given text using the Gemini API."""
         try:
-            response = self._genai_model.count_tokens(text)
+            response = await self._genai_model.count_tokens_async(text)
             return response.total_tokens
         except GoogleAPIError as e:
             logging.error(f"Failed to count tokens via Gemini API: {e}")
@@ -42,10 +53,19 @@ class TokenManager:
             logging.error(f"An unexpected error occurred during token counting: {e}")
             raise TokenManagerError(f"An unexpected error occurred during token counting: {e}") from e
 
-    def validate_input_size(self, code: str) -> bool:
-        """Checks if the code is within the acceptable token limit."""
+    async def validate_input_size(self, code: str) -> bool:
+        """
+        Checks if the code is within the acceptable token limit.
+        Inputs that can't be decided from their byte length get an exact count from the Gemini API.
+        """
+        # Every token covers at least one byte of input, so anything no longer than the limit
+        # in bytes is guaranteed to fit and needs no tokenizer at all
+        if len(code.encode("utf-8")) <= self.max_tokens:
+            return True
+
+        # Past that point the local estimate could undercount and let oversized input through
         try:
-            token_count = self.estimate_tokens(code)
+            token_count = await self.count_tokens(code)
             is_valid = token_count <= self.max_tokens
             if not is_valid:
                 logging.error(f"Input validation failed: {token_count} tokens > {self.max_tokens} limit.")
@@ -54,19 +74,19 @@ class TokenManager:
             logging.error(f"Could not validate input size due to token counting error: {e}")
             raise HTTPException(status_code=500, detail=f"Failed to estimate token count for input validation: {e}")
 
-    def chunk_code_intelligently(self, code: str) -> list[str]:
+    async def chunk_code_intelligently(self, code: str) -> list[str]:
         """
         Splits large code into smaller chunks using the AST to preserve
         function and class boundaries.
         """
-        if self.validate_input_size(code):
+        if await self.validate_input_size(code):
             return [code]
 
         logging.info("Code exceeds max tokens, attempting intelligent chunking...")
+        lines = code.splitlines() # Split once; shared by the AST path and the fallback
         
         try:
             tree = ast.parse(code)
-            lines = code.splitlines()
             chunks = []
             current_chunk_lines = []
             current_chunk_tokens = 0
@@ -79,7 +99,7 @@ class TokenManager:
                 node_lines = lines[start_line:end_line]
                 node_text = "\n".join(node_lines)
                 
-                # Use Gemini-specific token estimation for each node
+                # Local estimate per node, so chunking doesn't cost an API round-trip per node
                 node_tokens = self.estimate_tokens(node_text)
 
                 # If a single node is too large, it becomes its own chunk (a necessary evil)
@@ -112,7 +132,6 @@ class TokenManager:
         except SyntaxError as e:
             logging.error(f"Cannot chunk code due to syntax error: {e}")
             logging.warning("Falling back to naive line-based chunking due to AST parsing failure.")
-            lines = code.splitlines()
             return ["\n".join(lines[i:i + 100]) for i in range(0, len(lines), 100)]
         except TokenManagerError as e:
             logging.error(f"Failed to chunk code due to token counting error: {e}")
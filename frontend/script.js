@@ -6,7 +6,7 @@ document.addEventListener('DOMContentLoaded', () => {
     const errorMessage = document.getElementById('error-message');
     const loadingSpinner = document.getElementById('loading-spinner');
 
-    const FASTAPI_BACKEND_URL = "https://ai-algorithm-tutor-backend.onrender.com/explain/";
+    const FASTAPI_BACKEND_URL = "https://ai-algorithm-tutor-backend.onrender.com/explain/stream/";
 
     const showLoading = () => {
         explainButton.disabled = true;
@@ -28,16 +28,38 @@ document.addEventListener('DOMContentLoaded', () => {
         explanationOutput.innerHTML = '<p>An error occurred. Please try again or check your code/purpose.</p>';
     };
 
-    const displayExplanation = (explanation) => {
+    const renderExplanation = (explanation) => {
         if (typeof marked !== 'undefined') {
             explanationOutput.innerHTML = marked.parse(explanation);
         } else {
             explanationOutput.innerHTML = `<pre><code>${explanation}</code></pre>`;
+        }
+    };
+
+    const displayExplanation = (explanation) => {
+        renderExplanation(explanation);
+        if (typeof marked === 'undefined') {
             console.error("marked.js is not loaded. Displaying raw Markdown.");
         }
         explanationOutput.scrollTop = 0;
     };
 
+    // Renders the explanation progressively as the backend streams it
+    const streamExplanation = async (response) => {
+        const reader = response.body.getReader();
+        const decoder = new TextDecoder();
+        let explanation = "";
+
+        while (true) {
+            const { done, value } = await reader.read();
+            if (done) break;
+            explanation += decoder.decode(value, { stream: true });
+            renderExplanation(explanation);
+        }
+        explanation += decoder.decode();
+        displayExplanation(explanation || "No explanation received.");
+    };
+
     explainButton.addEventListener('click', async () => {
         const code = codeInput.value.trim();
         const purpose = purposeInput.value.trim();
@@ -64,8 +86,7 @@ document.addEventListener('DOMContentLoaded', () => {
             });
 
             if (response.ok) {
-                const data = await response.json();
-                displayExplanation(data.explanation || "No explanation received.");
+                await streamExplanation(response);
             } else {
                 const errorData = await response.json();
                 displayError(errorData.detail || `Server returned status ${response.status}`);
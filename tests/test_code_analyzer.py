@@ -0,0 +1,48 @@
+from backend.src.code_analyzer import CodeAnalyzer
+
+# Imports and classes nested at different depths, to pin the order they are reported in
+NESTED_CODE = """
+import os
+
+class Outer:
+    import json
+
+    class Inner:
+        def method(self):
+            from collections import deque
+            return deque()
+
+from typing import Any
+
+def helper(value):
+    class Local:
+        pass
+    return len(value)
+"""
+
+
+def test_high_level_summary_lists_nested_definitions_in_source_order():
+    analysis = CodeAnalyzer(NESTED_CODE).analyze()
+
+    assert analysis["high_level_summary"] == {
+        "imports": ["os", "json", "collections.deque", "typing.Any"],
+        "class_definitions": ["Outer", "Inner", "Local"],
+        "total_functions": 2,
+        "total_lines": 17
+    }
+
+
+def test_function_analysis_and_line_types():
+    analysis = CodeAnalyzer(NESTED_CODE).analyze()
+
+    helper = analysis["functions"]["helper"]
+    assert helper["parameters"] == ["value"]
+    assert helper["return_statements"] == 1
+    assert helper["start_line"] == 14
+    assert helper["dependencies"]["calls"] == ["len"]
+    assert sorted(helper["dependencies"]["uses_variables"]) == ["len", "value"]
+
+    line_types = {line["line_number"]: line["types"] for line in analysis["line_by_line"]}
+    assert line_types[10] == ["Class Definition", "Function Definition", "Return Statement"]
+    assert line_types[16] == ["Function Definition", "Class Definition", "Pass Statement"]
+    assert 1 not in line_types # Blank lines are skipped
@@ -1,9 +1,16 @@
+import ast
 import pytest
 from fastapi.testclient import TestClient
-from backend.main import app 
+from backend.main import app, analysis_cache, purpose_match_cache
 
 client = TestClient(app)
 
+@pytest.fixture(autouse=True)
+def clear_caches():
+    """Keeps cached analyses from one test leaking into the next."""
+    analysis_cache.clear()
+    purpose_match_cache.clear()
+
 # A sample valid Python code for testing
 SAMPLE_CODE = "def hello():\n    print('Hello, World!')"
 
@@ -69,9 +76,13 @@ def test_explain_code_input_too_large(mocker, monkeypatch):
     monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
     mocker.patch("backend.main.ast.parse")
     mocker.patch("backend.main.TokenManager.validate_input_size", return_value=False)
+    analyze = mocker.patch("backend.main.CodeAnalyzer.analyze")
     response = client.post("/explain/", json={"code": SAMPLE_CODE})
     assert response.status_code == 413
     assert response.json()["detail"] == "Input code exceeds the maximum allowed size."
+    # Oversized input is rejected before any analysis is run or cached
+    analyze.assert_not_called()
+    assert len(analysis_cache) == 0
     
 from backend.src.llm_integration.llm_client import LLMClientError
 
@@ -94,8 +105,10 @@ def test_explain_code_with_purpose_success(mocker, monkeypatch):
     mocker.patch("backend.main.ast.parse")
     mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
     mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
-    mocker.patch("backend.main.PurposeAnalyzer.analyze_purpose", return_value={"structured_purpose": "mocked"})
-    mocker.patch("backend.main.SemanticMatcher.generate_match_report", return_value={"match": 0.9})
+    combined_analyze = mocker.patch(
+        "backend.main.CombinedAnalyzer.analyze",
+        return_value={"structured_purpose": {"main_functionality": "mocked"}, "match_report": {"match_confidence": 0.9}}
+    )
     mocker.patch(
         "backend.main.HierarchicalExplainer.generate_explanation",
         return_value="## Mocked Explanation with Purpose\nThis is a test."
@@ -107,5 +120,130 @@ def test_explain_code_with_purpose_success(mocker, monkeypatch):
     data = response.json()
     assert "explanation" in data
     assert data["explanation"] == "## Mocked Explanation with Purpose\nThis is a test."
-    assert mocker.call("backend.main.PurposeAnalyzer.analyze_purpose").called
-    assert mocker.call("backend.main.SemanticMatcher.generate_match_report").called
\ No newline at end of file
+    combined_analyze.assert_awaited_once()
+
+def test_explain_code_repeated_request_uses_cache(mocker, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
+    parse = mocker.patch("backend.main.ast.parse", wraps=ast.parse)
+    analyze = mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
+    combined_analyze = mocker.patch(
+        "backend.main.CombinedAnalyzer.analyze",
+        return_value={"structured_purpose": {"main_functionality": "mocked"}, "match_report": {"match_confidence": 0.9}}
+    )
+    mocker.patch("backend.main.HierarchicalExplainer.generate_explanation", return_value="## Mocked Explanation")
+
+    payload = {"code": SAMPLE_CODE, "purpose": "Test purpose"}
+    first = client.post("/explain/", json=payload)
+    second = client.post("/explain/", json=payload)
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    # The cache hit skips both the parse and the analysis
+    parse.assert_called_once()
+    analyze.assert_called_once()
+    combined_analyze.assert_awaited_once()
+
+
+def test_explain_code_large_input_is_not_cached(mocker, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    monkeypatch.setattr("backend.main.MAX_CACHED_CODE_BYTES", len(SAMPLE_CODE.encode("utf-8")) - 1)
+    mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
+    analyze = mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
+    mocker.patch("backend.main.HierarchicalExplainer.generate_explanation", return_value="## Mocked Explanation")
+
+    first = client.post("/explain/", json={"code": SAMPLE_CODE})
+    second = client.post("/explain/", json={"code": SAMPLE_CODE})
+
+    assert first.status_code == 200
+    assert second.status_code == 200
+    assert analyze.call_count == 2
+    assert len(analysis_cache) == 0
+
+
+def test_explain_code_input_at_cache_threshold_is_cached(mocker, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    monkeypatch.setattr("backend.main.MAX_CACHED_CODE_BYTES", len(SAMPLE_CODE.encode("utf-8")))
+    mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
+    analyze = mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
+    mocker.patch("backend.main.HierarchicalExplainer.generate_explanation", return_value="## Mocked Explanation")
+
+    client.post("/explain/", json={"code": SAMPLE_CODE})
+    client.post("/explain/", json={"code": SAMPLE_CODE})
+
+    analyze.assert_called_once()
+    assert len(analysis_cache) == 1
+
+def test_explain_code_stream_success(mocker, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
+    mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
+
+    async def fake_stream(*args, **kwargs):
+        yield "## Mocked "
+        yield "Explanation"
+
+    mocker.patch("backend.main.HierarchicalExplainer.stream_explanation", side_effect=fake_stream)
+
+    response = client.post("/explain/stream/", json={"code": SAMPLE_CODE})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/markdown")
+    assert response.text == "## Mocked Explanation"
+
+
+@pytest.mark.parametrize("bad_reply", [
+    ["not", "a", "dict"],
+    {"unexpected": "keys"},
+    {"structured_purpose": "not a dict", "match_report": {"match_confidence": 0.9}},
+])
+def test_explain_code_malformed_purpose_reply_is_not_cached(mocker, monkeypatch, bad_reply):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
+    mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
+    make_request = mocker.patch("backend.main.LLMClient.make_request", return_value=bad_reply)
+
+    payload = {"code": SAMPLE_CODE, "purpose": "Test purpose"}
+    first = client.post("/explain/", json=payload)
+    second = client.post("/explain/", json=payload)
+
+    assert first.status_code == 503
+    assert second.status_code == 503
+    # The retry asks the model again instead of replaying the bad reply
+    assert make_request.await_count == 2
+    assert len(purpose_match_cache) == 0
+
+
+def test_explain_code_stream_fails_before_first_chunk(mocker, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
+    mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
+
+    async def failing_stream(*args, **kwargs):
+        raise LLMClientError("Mock LLM failure")
+        yield
+
+    mocker.patch("backend.main.HierarchicalExplainer.stream_explanation", side_effect=failing_stream)
+
+    response = client.post("/explain/stream/", json={"code": SAMPLE_CODE})
+
+    assert response.status_code == 503
+    assert "An error occurred with the AI model: Mock LLM failure" in response.json()["detail"]
+
+
+def test_explain_code_stream_fails_mid_stream(mocker, monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    mocker.patch("backend.main.TokenManager.validate_input_size", return_value=True)
+    mocker.patch("backend.main.CodeAnalyzer.analyze", return_value={"summary": "mocked analysis"})
+
+    async def interrupted_stream(*args, **kwargs):
+        yield "## Partial Explanation"
+        raise LLMClientError("Mock LLM failure")
+
+    mocker.patch("backend.main.HierarchicalExplainer.stream_explanation", side_effect=interrupted_stream)
+
+    response = client.post("/explain/stream/", json={"code": SAMPLE_CODE})
+
+    assert response.status_code == 200
+    assert response.text.startswith("## Partial Explanation")
+    assert response.text.endswith("**Error:** The explanation was interrupted: Mock LLM failure")
@@ -0,0 +1,58 @@
+import asyncio
+import pytest
+from fastapi import HTTPException
+from backend.src.token_manager import TokenManager, TokenManagerError
+
+# Five small top-level functions, each well under the token limit on its own
+MULTI_FUNCTION_CODE = "\n".join(f"def func_{i}():\n    return {i}\n" for i in range(5))
+
+
+@pytest.fixture
+def token_manager(monkeypatch):
+    monkeypatch.setenv("GEMINI_API_KEY", "fake-api-key")
+    return TokenManager(max_tokens=20)
+
+
+def test_chunk_code_intelligently_estimates_nodes_locally(mocker, token_manager):
+    # The whole input is over the limit, so it has to be chunked
+    count_tokens = mocker.patch.object(token_manager, "count_tokens", return_value=100)
+
+    chunks = asyncio.run(token_manager.chunk_code_intelligently(MULTI_FUNCTION_CODE))
+
+    assert len(chunks) > 1
+    assert all(f"def func_{i}():" in "".join(chunks) for i in range(5))
+    # Only the up-front size check goes to the API; each node is estimated locally
+    count_tokens.assert_awaited_once_with(MULTI_FUNCTION_CODE)
+
+
+def test_validate_input_size_accepts_input_at_the_byte_limit_without_counting(mocker, token_manager):
+    count_tokens = mocker.patch.object(token_manager, "count_tokens")
+
+    assert asyncio.run(token_manager.validate_input_size("x" * 20)) is True
+    count_tokens.assert_not_awaited()
+
+
+def test_validate_input_size_counts_multibyte_input_over_the_byte_limit(mocker, token_manager):
+    # 15 characters but 30 UTF-8 bytes, so the byte prefilter can't decide it
+    code = "é" * 15
+    count_tokens = mocker.patch.object(token_manager, "count_tokens", return_value=15)
+
+    assert asyncio.run(token_manager.validate_input_size(code)) is True
+    count_tokens.assert_awaited_once_with(code)
+
+
+def test_validate_input_size_rejects_input_whose_count_exceeds_the_limit(mocker, token_manager):
+    count_tokens = mocker.patch.object(token_manager, "count_tokens", return_value=21)
+
+    assert asyncio.run(token_manager.validate_input_size("x" * 40)) is False
+    count_tokens.assert_awaited_once()
+
+
+def test_validate_input_size_turns_counting_errors_into_http_500(mocker, token_manager):
+    mocker.patch.object(token_manager, "count_tokens", side_effect=TokenManagerError("Mock counting failure"))
+
+    with pytest.raises(HTTPException) as exc_info:
+        asyncio.run(token_manager.validate_input_size("x" * 40))
+
+    assert exc_info.value.status_code == 500
+    assert "Mock counting failure" in exc_info.value.detail